@@ -5,12 +5,20 @@ Implementation of a graph class and a shortest path algorithm.
 author: edelsonc
 created: 10/08/2016
 """
-import priorityQueue as pQ
+import sys
+from array import array
+from collections import deque
+from itertools import accumulate
 
 
 class Graph(object):
     """
-    A simple implementation of a directed unweighted graph
+    A simple implementation of a directed unweighted graph. vertexList and
+    connections can be read directly, but the graph may only be changed
+    through addVertex and addConn. Those methods also keep the membership
+    sets and the frozen CSR copy used by the graph algorithms up to date, so
+    editing vertexList or connections in place leaves the algorithms working
+    on a stale graph.
     """
     def __init__(self):
         """
@@ -26,11 +34,16 @@ class Graph(object):
         """
         self.vertexList = []
         self.connections = {}
+        self._vertexSet = set()
+        self._connSets = {}
+        self._indices = None
+        self._reorder = "insertion"
 
     def addVertex(self, vertex):
         """
         Adds a vertex to the graph object. Makes sure that the vertex is not
-        already a part of the graph
+        already a part of the graph. Plain str vertices are interned, so that
+        the dictionary lookups keyed by vertex can match on identity.
 
         Arguments
         ---------
@@ -50,12 +63,32 @@ class Graph(object):
         >>> graph.addVertex("A")
         >>> graph.vertexList
         ['A']
+
+        Interned Vertex Names
+        ---------------------
+        >>> name = "".join(["B", "C"])
+        >>> graph.addVertex(name)
+        >>> graph.vertexList[-1] is sys.intern("BC")
+        True
+
+        Adding str Subclass Vertex (stored as given, not interned)
+        ----------------------------------------------------------
+        >>> class Name(str):
+        ...     pass
+        >>> graph.addVertex(Name("D"))
+        >>> graph.hasVert("D")
+        True
         """
-        if vertex in self.vertexList:
+        if type(vertex) is str:
+            vertex = sys.intern(vertex)
+        if vertex in self._vertexSet:
             return
 
         self.vertexList.append(vertex)
+        self._vertexSet.add(vertex)
         self.connections[vertex] = []
+        self._connSets[vertex] = set()
+        self._indices = None
 
     def addConn(self, v1, v2):
         """
@@ -82,16 +115,31 @@ class Graph(object):
         ['A', 'B', 'C']
         >>> graph.connections['A']
         ['B', 'C']
+
+        Adding Edge with a str Subclass Vertex
+        --------------------------------------
+        >>> class Name(str):
+        ...     pass
+        >>> graph.addConn(Name("C"), Name("E"))
+        >>> graph.connections['C']
+        ['E']
         """
-        if v1 not in self.vertexList:
+        if type(v1) is str:
+            v1 = sys.intern(v1)
+        if type(v2) is str:
+            v2 = sys.intern(v2)
+
+        if v1 not in self._vertexSet:
             self.addVertex(v1)
-        if v2 not in self.vertexList:
+        if v2 not in self._vertexSet:
             self.addVertex(v2)
 
-        if v2 in self.connections[v1]:
+        if v2 in self._connSets[v1]:
             return
 
         self.connections[v1].append(v2)
+        self._connSets[v1].add(v2)
+        self._indices = None
 
     def hasVert(self, vert):
         """
@@ -113,7 +161,7 @@ class Graph(object):
         >>> graph.hasVert("K")
         False
         """
-        return vert in self.vertexList
+        return vert in self._vertexSet
 
     def getConns(self, vert):
         """
@@ -161,6 +209,117 @@ class Graph(object):
         """
         return self.vertexList
 
+    def freeze(self, reorder=None):
+        """
+        Builds a compressed sparse row (CSR) copy of the connections for use
+        by the read-only graph algorithms. Every vertex is given an integer id,
+        and the ids of the neighbours of vertex i are stored in
+        _neighbors[_indices[i]:_indices[i+1]]. The copy is rebuilt lazily
+        after the graph is changed through addVertex or addConn; changes made
+        to vertexList or connections directly are not seen.
+
+        Arguments
+        ---------
+        reorder -- how vertex ids are assigned. "insertion" follows vertexList;
+                   "rcm" uses Reverse Cuthill-McKee order, which places
+                   connected vertices close together in the arrays. The
+                   choice is kept for later rebuilds; defaults to None, which
+                   keeps the current choice ("insertion" for a new graph)
+
+        Freeze Graph
+        ------------
+        >>> graph = Graph()
+        >>> graph.addConn("A", "B")
+        >>> graph.addConn("A", "C")
+        >>> graph.addConn("C", "A")
+        >>> graph.freeze()
+        >>> graph._id_of
+        {'A': 0, 'B': 1, 'C': 2}
+        >>> list(graph._indices)
+        [0, 2, 2, 3]
+        >>> list(graph._neighbors)
+        [1, 2, 0]
+
+        Changing a Frozen Graph
+        -----------------------
+        >>> graph.addConn("B", "C")
+        >>> graph.freeze()
+        >>> list(graph._indices)
+        [0, 2, 3, 4]
+
+        Reverse Cuthill-McKee Order
+        ---------------------------
+        >>> graph = Graph()
+        >>> for vert in ["A", "B", "C", "D", "E"]:
+        ...     graph.addVertex(vert)
+        >>> for va, vb in [("A", "C"), ("C", "E"), ("E", "B"), ("B", "D")]:
+        ...     graph.addConn(va, vb)
+        >>> graph.freeze(reorder="rcm")
+        >>> graph._vertex_of
+        ['D', 'B', 'E', 'C', 'A']
+        >>> list(graph._indices)
+        [0, 0, 1, 2, 3, 4]
+        >>> list(graph._neighbors)
+        [0, 1, 2, 3]
+        >>> graph.freeze(reorder="other")
+        Traceback (most recent call last):
+            ...
+        ValueError: Unknown vertex order: other
+        """
+        if reorder is not None and reorder != self._reorder:
+            if reorder not in ("insertion", "rcm"):
+                raise ValueError('Unknown vertex order: {}'.format(reorder))
+            self._reorder = reorder
+            self._indices = None
+
+        if self._indices is not None:
+            return
+
+        if self._reorder == "rcm":
+            self._vertex_of = self._rcmOrder()
+        else:
+            self._vertex_of = list(self.vertexList)
+        self._id_of = {vert: i for i, vert in enumerate(self._vertex_of)}
+        self._neighbors = array('l', (self._id_of[conn]
+                                      for vert in self._vertex_of
+                                      for conn in self.connections[vert]))
+        self._indices = array('l', accumulate(
+            [0] + [len(self.connections[vert]) for vert in self._vertex_of]))
+
+    def _rcmOrder(self):
+        """
+        Helper function for freeze. Returns the vertices in Reverse
+        Cuthill-McKee order: a breadth-first search from a vertex of lowest
+        degree in each component, visiting neighbours by increasing degree,
+        reversed at the end. Edges are treated as undirected, and ties are
+        broken by position in vertexList.
+        """
+        adjacent = {vert: set(self.connections[vert])
+                    for vert in self.vertexList}
+        for vert in self.vertexList:
+            for conn in self.connections[vert]:
+                adjacent[conn].add(vert)
+        rank = {vert: (len(adjacent[vert]), i)
+                for i, vert in enumerate(self.vertexList)}
+
+        order = []
+        placed = set()
+        for root in sorted(self.vertexList, key=rank.__getitem__):
+            if root in placed:
+                continue
+            placed.add(root)
+            queue = deque([root])
+            while queue:
+                vert = queue.popleft()
+                order.append(vert)
+                for conn in sorted(adjacent[vert] - placed,
+                                   key=rank.__getitem__):
+                    placed.add(conn)
+                    queue.append(conn)
+
+        order.reverse()
+        return order
+
     def __iter__(self):
         """
         Allows the user to iterate over the keys of the graph (vertexList)
@@ -180,18 +339,19 @@ class Graph(object):
         return iter(self.vertexList)
 
 
-def find_shortest_path(graph, start, end, path=[]):
+def find_shortest_path(graph, start, end, path=None):
     """
-    Recursive search for shortest path in a directed unweighted graph. Returns
-    the actual path connecting the start and end. For the path lenght, just
-    take the len() of the return.
+    Breadth-first search for shortest path in a directed unweighted graph.
+    Returns the actual path connecting the start and end. For the path lenght,
+    just take the len() of the return.
 
     Arguments
     ---------
     graph -- object of the Graph class
     start -- starting vertex; must be in graph
     end -- ending vertex; must be in graph
-    path -- starting path; defaults to empty list
+    path -- starting path; defaults to None (an empty path). Its vertices are
+            not revisited and a copy of it is prepended to the result
 
     Shortest Path for Existing Vertices
     -----------------------------------
@@ -206,29 +366,72 @@ def find_shortest_path(graph, start, end, path=[]):
     >>> find_shortest_path(graph, "A", "D")
     ['A', 'D']
 
+    Shortest Path with Starting Path
+    --------------------------------
+    >>> find_shortest_path(graph, "B", "D", ["A"])
+    ['A', 'B', 'C', 'D']
+
     Shortest Path Missing Vertex
     ----------------------------
     >>> find_shortest_path(graph, "A", "K")
+
+    Shortest Path in a Dense Graph
+    ------------------------------
+    >>> graph = Graph()
+    >>> for va in range(200):
+    ...     for vb in range(va + 1, 200):
+    ...         graph.addConn(va, vb)
+    >>> find_shortest_path(graph, 0, 199)
+    [0, 199]
+    >>> find_shortest_path(graph, 199, 0)
     """
-    path = path + [start]
+    path = [] if path is None else list(path)
 
     if start == end:
-        return path
+        return path + [start]
 
     if not graph.hasVert(start) or not graph.hasVert(end):
         return None
 
-    shortest = None
-
-    for node in graph.getConns(start):
-        if node not in path:
-            newpath = find_shortest_path(graph, node, end, path)
-
-            if newpath:
-                if not shortest or len(newpath) < len(shortest):
-                    shortest = newpath
-
-    return shortest
+    graph.freeze()
+    indices = graph._indices
+    neighbors = graph._neighbors
+    vertex_of = graph._vertex_of
+    source = graph._id_of[start]
+    target = graph._id_of[end]
+
+    # one flag per vertex id; vertices of the starting path are marked
+    # visited so the search never passes back through them
+    visited = bytearray(len(vertex_of))
+    for vert in path:
+        if graph.hasVert(vert):
+            visited[graph._id_of[vert]] = 1
+    visited[source] = 1
+    parent = [None] * len(vertex_of)
+    queue = deque([source])
+    popleft = queue.popleft
+    enqueue = queue.append
+
+    while queue:
+        current = popleft()
+        for j in range(indices[current], indices[current + 1]):
+            node = neighbors[j]
+            if visited[node]:
+                continue
+            visited[node] = 1
+            parent[node] = current
+
+            if node == target:
+                route = [vertex_of[node]]
+                while node != source:
+                    node = parent[node]
+                    route.append(vertex_of[node])
+                route.reverse()
+                return path + route
+
+            enqueue(node)
+
+    return None
 
 
 def Dijkstra(graph, source):
@@ -248,37 +451,108 @@ def Dijkstra(graph, source):
     >>> dists = Dijkstra(graph, 'A')
     >>> dists['D']
     2
+    >>> dists['A']
+    0
+
+    Unreachable Vertices
+    --------------------
+    >>> graph.addVertex("E")
+    >>> Dijkstra(graph, 'A')['E']
+    inf
+
+    Source Missing from Graph
+    -------------------------
+    >>> Dijkstra(graph, 'K')['A']
+    inf
     """
-    dist = {}
-    pq = pQ.BinaryHeap()
-    for node in graph:
-        if node != source:
-            dist[node] = float('inf')
-        else:
-            dist[node] = 0
-
-        pq.insert((dist[node], node))
-    
-    while not pq.isEmpty():
-        current = pq.delMin()
-        for next_node in graph.getConns(current[1]):
-            new_dist = current[0] + 1
+    graph.freeze()
+    if not graph.hasVert(source):
+        return dict.fromkeys(graph, float('inf'))
+
+    dist = _dijkstra_csr(graph._indices, graph._neighbors,
+                         graph._id_of[source], len(graph._vertex_of))
+
+    id_of = graph._id_of
+    return {vert: dist[id_of[vert]] for vert in graph}
+
+
+def all_pairs_shortest_paths(graph):
+    """
+    Shortest path lengths between every pair of vertices. Returns a dict of
+    dicts, where result[va][vb] is the distance from va to vb, or inf when vb
+    can't be reached. The graph is frozen once and the Dijkstra kernel is run
+    from each vertex over the same CSR arrays.
+
+    Arguments
+    ---------
+    graph -- directed graph; object of Graph class
+
+    >>> graph = Graph()
+    >>> conns = [ ("A", "B"), ("A", "C"), ("B", "C"), ("C", "D") ]
+    >>> for va, vb in conns:
+    ...     graph.addConn(va, vb)
+    >>> dists = all_pairs_shortest_paths(graph)
+    >>> dists['A']
+    {'A': 0, 'B': 1, 'C': 1, 'D': 2}
+    >>> dists['C']
+    {'A': inf, 'B': inf, 'C': 0, 'D': 1}
+    """
+    graph.freeze()
+    indices = graph._indices
+    neighbors = graph._neighbors
+    id_of = graph._id_of
+    n = len(graph._vertex_of)
+
+    result = {}
+    for source in graph:
+        dist = _dijkstra_csr(indices, neighbors, id_of[source], n)
+        result[source] = {vert: dist[id_of[vert]] for vert in graph}
+
+    return result
+
+
+def _dijkstra_csr(indices, neighbors, source, n):
+    """
+    Kernel of Dijkstra's algorithm. Works only on the integer CSR arrays built
+    by Graph.freeze, and returns a list of the distances from source indexed
+    by vertex id. Every edge has weight 1, so vertices reach the queue in
+    order of distance and a FIFO queue stands in for the priority queue.
+
+    Arguments
+    ---------
+    indices, neighbors -- CSR arrays of a frozen graph
+    source -- id of the start vertex
+    n -- number of vertices in the graph
+    """
+    dist = [float('inf')] * n
+    dist[source] = 0
+
+    # a vertex is settled the first time it is reached, so each one is queued
+    # and expanded exactly once
+    queue = deque([source])
+    popleft = queue.popleft
+    enqueue = queue.append
+    while queue:
+        current = popleft()
+        new_dist = dist[current] + 1
+        for j in range(indices[current], indices[current + 1]):
+            next_node = neighbors[j]
             if new_dist < dist[next_node]:
                 dist[next_node] = new_dist
-                pq.editHeap(next_node, (dist[next_node], next_node))
-                
+                enqueue(next_node)
+
     return dist
 
 
 def check_cycles(graph):
     """
-    Checks graph object for a cycle. Algorithm adapted from:
-    http://codereview.stackexchange.com/questions/86021/check-if-a-directed-graph-contains-a-cycle
+    Checks graph object for a cycle. Runs an iterative depth-first search over
+    the frozen graph, marking each vertex as unvisited, on the current branch
+    or finished. An edge back to a vertex on the current branch is a cycle.
 
     Arguments
     ---------
     graph -- an object of the Graph class
-    start -- a vertex in graph
 
     Cycle Present
     -------------
@@ -293,35 +567,56 @@ def check_cycles(graph):
     >>> graph = Graph()
     >>> graph.addConn('A', 'B')
     >>> graph.addConn('A', 'C')
+    >>> graph.addConn('B', 'C')
     >>> check_cycles(graph)
     False
-    """
-    path = set()
-    visited = set()
-
-    return any(visit(vert, path, visited, graph) for vert in graph)
-
 
-def visit(vertex, visited, path, graph):
+    Deep Graph
+    ----------
+    >>> graph = Graph()
+    >>> for i in range(5000):
+    ...     graph.addConn(i, i + 1)
+    >>> check_cycles(graph)
+    False
+    >>> graph.addConn(5000, 0)
+    >>> check_cycles(graph)
+    True
     """
-    Fuction that is part of check_cycle. Acts to iterare through the path for
-    a single vertex, and find if it ever repeats. If it does, it returns True.
-    Otherwise, it will return Flase.
+    graph.freeze()
+    indices = graph._indices
+    neighbors = graph._neighbors
+
+    # one flag per vertex id: 0 unvisited, 1 on the current DFS branch and
+    # 2 finished; an edge back into the current branch closes a cycle
+    state = bytearray(len(graph._vertex_of))
+
+    for vert in range(len(state)):
+        if state[vert]:
+            continue
+        state[vert] = 1
+        # stack holds the current branch, and edge the CSR position of the
+        # next neighbour to try for each vertex on it
+        stack = [vert]
+        edge = [indices[vert]]
+
+        while stack:
+            vertex = stack[-1]
+            j = edge[-1]
+            if j == indices[vertex + 1]:
+                state[vertex] = 2
+                stack.pop()
+                edge.pop()
+                continue
+            edge[-1] = j + 1
+
+            neighbour = neighbors[j]
+            if state[neighbour] == 1:
+                return True
+            if state[neighbour] == 0:
+                state[neighbour] = 1
+                stack.append(neighbour)
+                edge.append(indices[neighbour])
 
-    Arguments
-    ---------
-    vertex -- vertex whose children will be searched
-    visited, path -- sets created in the check_cycle function
-    graph -- graph being checked for a cycle
-    """
-    if vertex in visited:
-        return False
-    visited.add(vertex)
-    path.add(vertex)
-    for neighbour in graph.getConns(vertex):
-        if neighbour in path or visit(neighbour, visited, path, graph):
-            return True
-    path.remove(vertex)
     return False
 
 if __name__ == '__main__':
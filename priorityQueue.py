@@ -8,12 +8,17 @@ created: 10/09/2016
 
 class BinaryHeap(object):
     """
-    Implements a binary heap as a priority que for use in graphing algorithms.
-    This heap design uses the base unit of a vertex tuple, which is composed of
-    three elements:
+    Implements a 4-ary heap as a priority que for use in graphing algorithms.
+    It keeps the name BinaryHeap for API compatibility. Each node has four
+    children rather than two, which makes the tree half as deep and keeps
+    siblings next to each other in memory. This heap design uses the base
+    unit of a vertex tuple, which is composed of two elements:
 
     (distance, "name")
 
+    Names are unique within the heap. Inserting a name that is already in the
+    heap updates its entry through editHeap instead of adding a second one.
+
     Methods
     ------
     percUp -- helper function for tree order. Moves small items up.
@@ -26,23 +31,31 @@ class BinaryHeap(object):
     editHeap -- updates an entry with a new version, searches by name
     display -- returns a vertex. Search is by name    
     """
+    # fixed attribute layout; no per-instance __dict__, which saves memory
+    __slots__ = ('_dist', '_name', '_pos', 'currentSize')
 
     def __init__(self):
         """
-        Initializes the BinaryHeap with a heapList and a size. The heapList has
-        a single entry, a tuple of (0, "0"). This is used as the pase of the
-        heap for integer division purposes. Additionally, this is selected as
-        it is the form that will be used with a graph algorithm, where the
-        positions are (distance, "name").
+        Initializes the BinaryHeap with a heapList and a size. The heapList is
+        stored as two parallel lists, _dist and _name, so that heap order only
+        ever compares distances. The heap is 0-indexed: the children of i are
+        4*i+1 through 4*i+4 and its parent is (i-1)//4. Entries take the form
+        that will be used with a graph algorithm, where the positions are
+        (distance, "name"). The index of every name is kept in _pos, so that
+        entries can be found without searching the heap.
         
         >>> heap = BinaryHeap()
         >>> print(heap.heapList)
-        [(0, '0')]
+        []
         >>> print(heap.currentSize)
         0
+        >>> hasattr(heap, '__dict__')
+        False
         """
-        self.heapList = [(0, "0")]
+        self._dist = []
+        self._name = []
         self.currentSize = 0
+        self._pos = {}
 
     def percUp(self, i):
         """
@@ -50,43 +63,66 @@ class BinaryHeap(object):
         making sure that no child is less than a parent, and then for any case
         where a child is less, moving them up the tree.
         """
-        while i // 2 > 0:
-            if self.heapList[i] < self.heapList[i//2]:
-                self.heapList[i//2], self.heapList[i] = self.heapList[i], \
-                self.heapList[i//2]
-            i = i // 2
+        dist, name, pos = self._dist, self._name, self._pos
+        while i > 0:
+            parent = (i - 1) >> 2
+            if dist[i] < dist[parent]:
+                dist[parent], dist[i] = dist[i], dist[parent]
+                name[parent], name[i] = name[i], name[parent]
+                pos[name[parent]] = parent
+                pos[name[i]] = i
+                i = parent
+            else:
+                break
 
     def insert(self, k):
         """
         Inserts an item into the aray. In this case the items are tuples which
         represent a vertex in a graph. The helper function percUp is used to
-        maintain heap order.
+        maintain heap order. If the name is already in the heap, its entry is
+        updated with editHeap instead.
         
         >>> heap = BinaryHeap()
         >>> heap.insert((10, "a"))
         >>> heap.insert((2, "b"))
         >>> heap.insert((6, "c"))
         >>> print(heap.heapList)
-        [(0, '0'), (2, 'b'), (10, 'a'), (6, 'c')]
-        
+        [(2, 'b'), (10, 'a'), (6, 'c')]
+
+        Inserting an Existing Name
+        --------------------------
+        >>> heap.insert((1, "a"))
+        >>> print(heap.heapList)
+        [(1, 'a'), (2, 'b'), (6, 'c')]
         """
-        self.heapList.append(k)
+        if k[1] in self._pos:
+            self.editHeap(k[1], k)
+            return
+
+        self._dist.append(k[0])
+        self._name.append(k[1])
+        self._pos[k[1]] = self.currentSize
         self.currentSize += 1
-        self.percUp(self.currentSize)
+        self.percUp(self.currentSize - 1)
 
     def percDown(self, i):
         """
         Helper function used in the minChild, delMin, and buildHeap methods.
         Used to move an item down a list if it is greater than any child item.
         """
-        while (i * 2) <= self.currentSize:
+        dist, name, pos = self._dist, self._name, self._pos
+        while (i * 4 + 1) < self.currentSize:
             mc = self.minChild(i)
-            if self.heapList[i] > self.heapList[mc]:
-                self.heapList[i], self.heapList[mc] = self.heapList[mc], \
-                self.heapList[i]
-            i = mc
+            if dist[i] > dist[mc]:
+                dist[i], dist[mc] = dist[mc], dist[i]
+                name[i], name[mc] = name[mc], name[i]
+                pos[name[i]] = i
+                pos[name[mc]] = mc
+                i = mc
+            else:
+                break
 
-    def minChild(self, i=1):
+    def minChild(self, i=0):
         """
         Returns the index of the minimum child. For graph tuples, this would be
         the tuple with the smallest distance.
@@ -96,17 +132,20 @@ class BinaryHeap(object):
         >>> heap.insert((4, "c"))
         >>> heap.insert((9, "f"))
         >>> print(heap.heapList)
-        [(0, '0'), (4, 'c'), (7, 'a'), (9, 'f')]
+        [(4, 'c'), (7, 'a'), (9, 'f')]
         >>> print(heap.minChild())
-        2
+        1
+        >>> heap.insert((8, "g"))
+        >>> heap.insert((5, "h"))
+        >>> print(heap.minChild())
+        4
         """
-        if i * 2 + 1 > self.currentSize:
-            return i * 2
-        else:
-            if self.heapList[i*2] < self.heapList[i*2+1]:
-                return i * 2
-            else:
-                return i * 2 + 1
+        dist = self._dist
+        mc = i * 4 + 1
+        for child in range(mc + 1, min(mc + 4, self.currentSize)):
+            if dist[child] < dist[mc]:
+                mc = child
+        return mc
 
     def delMin(self):
         """
@@ -118,17 +157,22 @@ class BinaryHeap(object):
         >>> heap.insert((2, 'a'))
         >>> heap.insert((4, 'r'))
         >>> print(heap.heapList)
-        [(0, '0'), (2, 'a'), (3, 'g'), (4, 'r')]
+        [(2, 'a'), (3, 'g'), (4, 'r')]
         >>> print(heap.delMin())
         (2, 'a')
         >>> print(heap.heapList)
-        [(0, '0'), (3, 'g'), (4, 'r')]
+        [(3, 'g'), (4, 'r')]
         """
-        retval = self.heapList[1]
-        self.heapList[1] = self.heapList[self.currentSize]
+        retval = (self._dist[0], self._name[0])
+        last_dist = self._dist.pop()
+        last_name = self._name.pop()
         self.currentSize -= 1
-        self.heapList.pop()
-        self.percDown(1)
+        del self._pos[retval[1]]
+        if self.currentSize > 0:
+            self._dist[0] = last_dist
+            self._name[0] = last_name
+            self._pos[last_name] = 0
+            self.percDown(0)
         return retval
 
     def buildHeap(self, alist):
@@ -139,25 +183,48 @@ class BinaryHeap(object):
         (distance, "name")
 
         where distance is either the Euclidean distance or another distance
-        derived from the X and Y position of the vertex and the name is the letter name of the vertex.
+        derived from the X and Y position of the vertex and the name is the
+        letter name of the vertex. The heap is ordered bottom-up in O(n), so
+        loading many vertices this way is cheaper than inserting them one at a
+        time, which costs O(n log n). alist itself is not modified. As with
+        insert, a repeated name keeps a single entry with its last distance.
         
         >>> vertex_list = [(1, "a"), (4, "b"), (2, "d")]
         >>> heap = BinaryHeap()
         >>> heap.buildHeap(vertex_list)
         >>> print(heap.heapList)
-        [(0, '0'), (1, 'a'), (4, 'b'), (2, 'd')]
+        [(1, 'a'), (4, 'b'), (2, 'd')]
+
+        Building and Emptying a Larger Heap
+        -----------------------------------
+        >>> vertex_list = [(d, str(d)) for d in [9, 3, 7, 1, 8, 2, 6, 0, 5, 4]]
+        >>> heap.buildHeap(vertex_list)
+        >>> [heap.delMin()[0] for i in range(len(vertex_list))]
+        [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+        >>> vertex_list[0]
+        (9, '9')
+
+        Repeated Names
+        --------------
+        >>> heap.buildHeap([(3, 'a'), (2, 'b'), (1, 'a')])
+        >>> print(heap.heapList)
+        [(1, 'a'), (2, 'b')]
         """
-        i = len(alist) // 2
-        self.currentSize = len(alist)
-        self.heapList = [(0, '0')] + alist[:]
-        while (i > 0):
+        entries = {}
+        for k in alist:
+            entries[k[1]] = k[0]
+        i = (len(entries) - 2) // 4
+        self.currentSize = len(entries)
+        self._dist = list(entries.values())
+        self._name = list(entries)
+        self._pos = {name: j for j, name in enumerate(self._name)}
+        while (i >= 0):
             self.percDown(i)
             i -= 1
 
     def isEmpty(self):
         """
-        Checks if heap is empty and returns boolean. Simply checks if list only
-        has init value.
+        Checks if heap is empty and returns boolean.
         
         >>> heap = BinaryHeap()
         >>> print(heap.isEmpty())
@@ -166,45 +233,87 @@ class BinaryHeap(object):
         >>> print(heap.isEmpty())
         False
         """
-        if self.heapList == [(0, '0')]:
-            return True
-        else:
-            return False
+        return not self._dist
 
     def editHeap(self, name, update):
         """
-        Updates a current tuple. Necessary for the graph algorithms
+        Updates a current tuple. Necessary for the graph algorithms. The entry
+        is found through the index map and moved up or down the tree from
+        where it is, so an update costs O(log n). Raises ValueError if the
+        update renames the entry to a name that is already in the heap.
         
         >>> heap = BinaryHeap()
         >>> heap.insert((2, 'a'))
         >>> print(heap.heapList)
-        [(0, '0'), (2, 'a')]
+        [(2, 'a')]
         >>> heap.editHeap('a', (2, 'b'))
         >>> print(heap.heapList)
-        [(0, '0'), (2, 'b')]
+        [(2, 'b')]
+
+        Decreasing a Distance
+        ---------------------
+        >>> heap.insert((5, 'c'))
+        >>> heap.insert((7, 'd'))
+        >>> heap.editHeap('d', (1, 'd'))
+        >>> print(heap.delMin())
+        (1, 'd')
+
+        Renaming to an Existing Name
+        ----------------------------
+        >>> heap.editHeap('b', (3, 'c'))
+        Traceback (most recent call last):
+            ...
+        ValueError: Name already in heap: c
         """
-        for i, tuple in enumerate(self.heapList):
-            if tuple[1] == name:
-                del self.heapList[i]
-                self.currentSize -= 1
-                self.insert(update)
-                return
-        # insert it if the name wasn't already in the list
-        self.insert(update)
+        if update[1] != name and update[1] in self._pos:
+            raise ValueError('Name already in heap: {}'.format(update[1]))
+
+        i = self._pos.get(name)
+        if i is None:
+            # insert it if the name wasn't already in the heap
+            self.insert(update)
+            return
+
+        old = self._dist[i]
+        del self._pos[name]
+        self._dist[i], self._name[i] = update
+        self._pos[update[1]] = i
+        if update[0] < old:
+            self.percUp(i)
+        else:
+            self.percDown(i)
 
     def display(self, name):
         """
         Find a vertex by name in the heap and display it. For looking at
-        content of a particular vertex.
+        content of a particular vertex. Returns None if the name is not in the
+        heap.
 
         >>> heap = BinaryHeap()
         >>> heap.insert((2, 'a'))
         >>> heap.display('a')
         (2, 'a')
+        >>> heap.display('k')
         """
-        for i, tuple in enumerate(self.heapList):
-            if tuple[1] == name:
-                return tuple
+        i = self._pos.get(name)
+        if i is None:
+            return None
+
+        return (self._dist[i], self._name[i])
+
+    @property
+    def heapList(self):
+        """
+        The heap as a list of (distance, "name") tuples, rebuilt from the
+        parallel _dist and _name lists. For inspecting the heap only.
+
+        >>> heap = BinaryHeap()
+        >>> heap.insert((5, 'a'))
+        >>> heap.insert((3, 'b'))
+        >>> heap.heapList
+        [(3, 'b'), (5, 'a')]
+        """
+        return list(zip(self._dist, self._name))
 
     def __contains__(self, item):
         """
@@ -217,8 +326,10 @@ class BinaryHeap(object):
         True
         >>> 'k' in heap
         False
+        >>> 1 in heap
+        False
         """
-        return any([ item in tuple for tuple in self.heapList ])
+        return item in self._pos
 
 if __name__ == '__main__':
     import doctest
@@ -6,11 +6,13 @@ Stochastic Gradient Descent Method for NCF graduate program.
 author: edelsonc
 created: 11/23/2016
 """
+from collections import deque
 
 class SimpleQueue(object):
     """
     Implementation of a simple queue in python. Queue is fixed at a maximum
-    length specified upon instantiation.
+    length specified upon instantiation. Items are stored in a
+    collections.deque, so appending to a full queue and dequeuing are O(1).
 
     Methods
     -------
@@ -31,10 +33,25 @@ class SimpleQueue(object):
         >>> sq.maxlen
         3
         >>> sq.list
-        []
+        deque([], maxlen=3)
         """
-        self.maxlen = maxlen
-        self.list = []
+        self.list = deque(maxlen=maxlen)
+
+    @property
+    def maxlen(self):
+        """
+        Maximum length of the queue. Read-only, since the deque evicting old
+        items is fixed at this length when the queue is created.
+
+        >>> sq = SimpleQueue(5)
+        >>> sq.maxlen
+        5
+        >>> sq.maxlen = 10  # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+            ...
+        AttributeError: can't set attribute
+        """
+        return self.list.maxlen
 
     def append(self, item):
         """
@@ -48,15 +65,13 @@ class SimpleQueue(object):
         >>> for i in range(5):
         ...     sq.append(i)
         >>> sq.list
-        [0, 1, 2, 3, 4]
+        deque([0, 1, 2, 3, 4], maxlen=5)
         >>> sq.append(33)
         >>> sq.list
-        [1, 2, 3, 4, 33]
+        deque([1, 2, 3, 4, 33], maxlen=5)
         """
+        # the deque drops the oldest item itself once maxlen is reached
         self.list.append(item)
-        if len(self.list) > self.maxlen:
-            self.list.pop(0)
-
 
     def dequeue(self):
         """
@@ -68,16 +83,16 @@ class SimpleQueue(object):
         >>> sq.dequeue()
         0
         >>> sq.list
-        [1, 2, 3, 4]
+        deque([1, 2, 3, 4], maxlen=5)
         """
-        return self.list.pop(0)
+        return self.list.popleft()
 
     def listAppend(self, alist):
         """
         >>> sq = SimpleQueue(5)
         >>> sq.listAppend([0, 1, 2, 3, 4])
         >>> sq.list
-        [0, 1, 2, 3, 4]
+        deque([0, 1, 2, 3, 4], maxlen=5)
 
         >>> sq.listAppend([5, 6, 7 ,8])
         Traceback (most recent call last):
@@ -109,14 +124,22 @@ class SimpleQueue(object):
 
     def __getitem__(self, i):
         """
-        Allows proper indexing of the queue
+        Allows proper indexing of the queue. Slices return a list, as they did
+        before the queue was backed by a deque.
 
         >>> sq = SimpleQueue(5)
         >>> for i in range(5):
         ...     sq.append(i)
         >>> sq[2]
         2
+        >>> sq[1:3]
+        [1, 2]
+        >>> sq[::-2]
+        [4, 2, 0]
         """
+        if isinstance(i, slice):
+            return list(self.list)[i]
+
         return self.list.__getitem__(i)
 
     def __str__(self):
@@ -129,7 +152,7 @@ class SimpleQueue(object):
         >>> print(sq)
         Current Queue: [0, 1, 2, 3, 4]
         """
-        return "Current Queue: {}".format(self.list)
+        return "Current Queue: {}".format(list(self.list))
 
 if __name__ == '__main__':
     import doctest